@@ -2,7 +2,7 @@ import re
 from collections import Counter
 from typing import Dict, List
 
-from bs4 import BeautifulSoup
+from page_parser import strip_html
 
 STOP_WORDS = {
     "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "had",
@@ -23,12 +23,9 @@ def normalize_text(raw_text: str) -> str:
     else:
         text = str(raw_text)
 
-    soup = BeautifulSoup(text, "html.parser")
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    text = soup.get_text(" ", strip=True)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    # lxml rather than BeautifulSoup's pure-Python html.parser, memoized so
+    # reruns with unchanged content skip the parse entirely
+    return strip_html(text)
 
 
 def _count_syllables(word: str) -> int:
@@ -3,12 +3,66 @@ Keyword Research Module
 Provides comprehensive keyword analysis, clustering, and insights for SEO optimization.
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import re
 from collections import Counter
+from functools import lru_cache
+import heapq
+from operator import itemgetter
 import math
 
+# Keyword columns use Arrow-backed strings when pyarrow is installed
+# (contiguous buffers for value_counts/.str ops), pandas' string dtype otherwise
+try:
+    import pyarrow  # noqa: F401
+    _KEYWORD_DTYPE = "string[pyarrow]"
+except ImportError:
+    _KEYWORD_DTYPE = "string"
+
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from",
+    "has", "he", "in", "is", "it", "its", "of", "on", "or", "that",
+    "the", "to", "was", "will", "with", "the", "this", "but", "not",
+    "you", "all", "can", "her", "what", "which", "who", "am", "have",
+    "if", "me", "my", "these", "those", "your", "about", "could", "does"
+})
+
+# Intent indicators, checked in this order by categorize_keyword_intent
+_INFORMATIONAL_TERMS = frozenset({
+    "what", "how", "why", "when", "where", "guide", "tutorial", "tips",
+    "best", "top", "learn", "understand", "explain", "definition", "vs",
+    "comparison", "review", "article", "blog", "news"
+})
+
+_TRANSACTIONAL_TERMS = frozenset({
+    "buy", "price", "coupon", "discount", "order", "shop", "sale",
+    "deal", "offer", "purchase", "checkout", "cart", "cost", "fee"
+})
+
+_NAVIGATIONAL_TERMS = frozenset({
+    "login", "signin", "sign up", "register", "facebook", "twitter",
+    "instagram", "youtube", "app", "download", "official"
+})
+
+
+def _split_terms(terms) -> Tuple[frozenset, Tuple[str, ...]]:
+    """Separate single-word terms (matched by set intersection) from multi-word phrases."""
+    words = frozenset(t for t in terms if " " not in t)
+    phrases = tuple(t for t in terms if " " in t)
+    return words, phrases
+
+
+_INTENT_TERMS = (
+    ("Informational", *_split_terms(_INFORMATIONAL_TERMS)),
+    ("Transactional", *_split_terms(_TRANSACTIONAL_TERMS)),
+    ("Navigational", *_split_terms(_NAVIGATIONAL_TERMS)),
+)
+
 
 # ---------- Keyword Extraction & Analysis ----------
 def extract_keywords_from_text(text: str, min_length: int = 2) -> List[str]:
@@ -16,19 +70,12 @@ def extract_keywords_from_text(text: str, min_length: int = 2) -> List[str]:
     Extract individual words from text, filtering out common stopwords.
     Returns a list of cleaned keywords.
     """
-    stopwords = {
-        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from",
-        "has", "he", "in", "is", "it", "its", "of", "on", "or", "that",
-        "the", "to", "was", "will", "with", "the", "this", "but", "not",
-        "you", "all", "can", "her", "what", "which", "who", "am", "have",
-        "if", "me", "my", "these", "those", "your", "about", "could", "does"
-    }
-    
-    # Convert to lowercase and split
-    words = re.findall(r'\b\w+\b', text.lower())
+    # Tokenize and lowercase in C (findall + map) rather than copying the
+    # whole text or creating a Match object per word
+    words = map(str.lower, _WORD_RE.findall(text))
     
     # Filter stopwords and short words
-    keywords = [w for w in words if w not in stopwords and len(w) >= min_length]
+    keywords = [w for w in words if len(w) >= min_length and w not in _STOPWORDS]
     
     return keywords
 
@@ -40,19 +87,35 @@ def analyze_keyword_frequency(keywords: List[str], top_n: int = 20) -> pd.DataFr
     if not keywords:
         return pd.DataFrame()
     
-    counter = Counter(keywords)
-    total = len(keywords)
+    counts = pd.Series(keywords, dtype=_KEYWORD_DTYPE).value_counts().head(top_n)
+    
+    frequency_df = counts.rename_axis("Keyword").reset_index(name="Frequency").astype({"Frequency": "int64"})
+    frequency_df["Percentage"] = (frequency_df["Frequency"] / len(keywords) * 100).round(2)
+    
+    return frequency_df
+
+
+def _frequency_from_counts(keyword_counts: Counter, total: int, top_n: int = 20) -> pd.DataFrame:
+    """
+    Build the same table as analyze_keyword_frequency from an already
+    aggregated Counter, so the keyword bag is not counted a second time.
+    """
+    items = heapq.nlargest(top_n, keyword_counts.items(), key=itemgetter(1))
+    if not items:
+        return pd.DataFrame()
     
-    data = []
-    for keyword, count in counter.most_common(top_n):
-        percentage = (count / total) * 100
-        data.append({
-            "Keyword": keyword,
-            "Frequency": count,
-            "Percentage": round(percentage, 2)
-        })
+    keywords, counts = zip(*items)
+    counts_arr = np.asarray(counts, dtype=np.int64)
     
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        "Keyword": keywords,
+        "Frequency": counts_arr,
+        "Percentage": np.round(counts_arr / total * 100, 2),
+    })
+
+
+_VARIATION_PREFIXES = ("what is ", "how to ", "best ")
+_VARIATION_SUFFIXES = (" tips", " guide", " tutorial", " tools")
 
 
 def generate_keyword_variations(keyword: str) -> List[str]:
@@ -66,33 +129,47 @@ def generate_keyword_variations(keyword: str) -> List[str]:
         variations.append(keyword + 's')
     
     # Add question forms
-    variations.extend([
-        f"what is {keyword}",
-        f"how to {keyword}",
-        f"best {keyword}",
-        f"{keyword} tips",
-        f"{keyword} guide",
-        f"{keyword} tutorial",
-        f"{keyword} tools",
-    ])
+    variations.extend([prefix + keyword for prefix in _VARIATION_PREFIXES])
+    variations.extend([keyword + suffix for suffix in _VARIATION_SUFFIXES])
     
     return variations
 
 
-def estimate_keyword_difficulty(keyword: str, keyword_frequency: int, total_keywords: int) -> Dict[str, Any]:
+def _difficulty_components(frequency, total_keywords: int, word_count):
     """
-    Estimate keyword difficulty based on frequency and characteristics.
-    Returns a difficulty assessment (Easy, Medium, Hard).
+    Element-wise difficulty math shared by the scalar helper and the report.
+    Accepts scalars or NumPy arrays; returns (difficulty_score, frequency_ratio).
     """
+    frequency = np.asarray(frequency, dtype=np.float64)
+    word_count = np.asarray(word_count, dtype=np.float64)
+    
     # Base difficulty from frequency (less frequent = harder)
-    frequency_ratio = keyword_frequency / total_keywords if total_keywords > 0 else 0
+    frequency_ratio = frequency / total_keywords if total_keywords > 0 else np.zeros_like(frequency)
     
     # Length multiplier (longer = easier to rank)
-    word_count = len(keyword.split())
     length_multiplier = word_count * 0.1
     
     # Calculate difficulty score (0-100)
-    difficulty_score = max(0, min(100, (1 - frequency_ratio) * 100 - length_multiplier * 10))
+    difficulty_score = np.clip((1 - frequency_ratio) * 100 - length_multiplier * 10, 0, 100)
+    
+    return difficulty_score, frequency_ratio
+
+
+def estimate_keyword_difficulty(
+    keyword: str,
+    keyword_frequency: int,
+    total_keywords: int,
+    word_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Estimate keyword difficulty based on frequency and characteristics.
+    Returns a difficulty assessment (Easy, Medium, Hard).
+    Pass a precomputed word_count to skip re-splitting the keyword.
+    """
+    if word_count is None:
+        word_count = len(keyword.split())
+    difficulty_score, frequency_ratio = _difficulty_components(keyword_frequency, total_keywords, word_count)
+    difficulty_score, frequency_ratio = float(difficulty_score), float(frequency_ratio)
     
     # Determine difficulty level
     if difficulty_score < 30:
@@ -124,30 +201,43 @@ def cluster_related_keywords(keywords: List[str], similarity_threshold: float =
     if not keywords:
         return {}
     
-    # Simple clustering based on common substrings
+    # Represent each distinct keyword (in first-seen order) as a row of a
+    # character incidence matrix, so one matrix-vector product gives the
+    # character-set intersection with every other keyword at once
+    unique_keywords = list(dict.fromkeys(keywords))
+    position = {keyword: i for i, keyword in enumerate(unique_keywords)}
+    char_index = {ch: i for i, ch in enumerate(sorted(set("".join(unique_keywords))))}
+    
+    incidence = np.zeros((len(unique_keywords), len(char_index)), dtype=np.float64)
+    for row, keyword in enumerate(unique_keywords):
+        incidence[row, [char_index[ch] for ch in set(keyword)]] = 1.0
+    sizes = incidence.sum(axis=1)
+    
     clusters = {}
-    used = set()
+    used = np.zeros(len(unique_keywords), dtype=bool)
     
-    for keyword in sorted(keywords):
-        if keyword in used:
+    for keyword in sorted(unique_keywords):
+        i = position[keyword]
+        if used[i]:
             continue
         
         cluster = [keyword]
-        used.add(keyword)
+        used[i] = True
         
-        # Find similar keywords
-        for other in keywords:
-            if other not in used and other != keyword:
-                # Calculate Jaccard similarity of characters
-                chars_key = set(keyword)
-                chars_other = set(other)
+        # Jaccard similarity of characters against the remaining keywords.
+        # It is bounded above by min(|A|, |B|) / max(|A|, |B|), so keywords
+        # whose set sizes are too far apart are pruned before intersecting
+        if sizes[i]:
+            size_ratio = np.minimum(sizes, sizes[i]) / np.maximum(sizes, sizes[i])
+            candidates = np.flatnonzero(~used & (size_ratio >= similarity_threshold))
+            if candidates.size:
+                intersection = incidence[candidates] @ incidence[i]
+                union = sizes[candidates] + sizes[i] - intersection
+                similarity = intersection / union
                 
-                if chars_key and chars_other:
-                    similarity = len(chars_key & chars_other) / len(chars_key | chars_other)
-                    
-                    if similarity >= similarity_threshold:
-                        cluster.append(other)
-                        used.add(other)
+                members = candidates[similarity >= similarity_threshold]
+                cluster.extend(unique_keywords[j] for j in members)
+                used[members] = True
         
         if len(cluster) > 1:  # Only keep clusters with multiple items
             clusters[keyword] = cluster
@@ -156,92 +246,85 @@ def cluster_related_keywords(keywords: List[str], similarity_threshold: float =
 
 
 # ---------- Keyword Intent Detection ----------
+@lru_cache(maxsize=100_000)
 def categorize_keyword_intent(keyword: str) -> str:
     """
     Categorize keyword search intent: Informational, Navigational, or Transactional
     """
-    keyword_lower = keyword.lower()
+    # Tokenize once; terms match whole words, so "when" no longer fires on "whenever"
+    tokens = _WORD_RE.findall(keyword.lower())
+    token_set = set(tokens)
+    padded = f" {' '.join(tokens)} "
     
-    # Informational indicators
-    informational_terms = {
-        "what", "how", "why", "when", "where", "guide", "tutorial", "tips",
-        "best", "top", "learn", "understand", "explain", "definition", "vs",
-        "comparison", "review", "article", "blog", "news"
-    }
-    
-    # Transactional indicators
-    transactional_terms = {
-        "buy", "price", "coupon", "discount", "order", "shop", "sale",
-        "deal", "offer", "purchase", "checkout", "cart", "cost", "fee"
-    }
-    
-    # Navigational indicators
-    navigational_terms = {
-        "login", "signin", "sign up", "register", "facebook", "twitter",
-        "instagram", "youtube", "app", "download", "official"
-    }
-    
-    # Check for keywords
-    for term in informational_terms:
-        if term in keyword_lower:
-            return "Informational"
-    
-    for term in transactional_terms:
-        if term in keyword_lower:
-            return "Transactional"
-    
-    for term in navigational_terms:
-        if term in keyword_lower:
-            return "Navigational"
+    for intent, words, phrases in _INTENT_TERMS:
+        if token_set & words or any(f" {phrase} " in padded for phrase in phrases):
+            return intent
     
     return "Mixed"
 
 
-def analyze_keyword_intent_distribution(keywords: List[str]) -> pd.DataFrame:
+def analyze_keyword_intent_distribution(keywords: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Analyze the distribution of search intents across keywords.
     """
-    intent_counts = {}
-    keyword_intents = []
-    
-    for keyword in keywords:
-        intent = categorize_keyword_intent(keyword)
-        keyword_intents.append({"Keyword": keyword, "Intent": intent})
-        intent_counts[intent] = intent_counts.get(intent, 0) + 1
+    keyword_series = pd.Series(keywords, name="Keyword")
+    intents = keyword_series.map(categorize_keyword_intent)
+    keyword_intents_df = pd.DataFrame({"Keyword": keyword_series, "Intent": intents})
     
-    # Create summary dataframe
-    summary_data = [
-        {"Intent": intent, "Count": count, "Percentage": round((count / len(keywords)) * 100, 1)}
-        for intent, count in intent_counts.items()
-    ]
+    # Create summary dataframe from the tagged frame in one counting pass
+    intent_counts = keyword_intents_df["Intent"].value_counts()
+    intent_summary_df = intent_counts.rename_axis("Intent").reset_index(name="Count")
+    intent_summary_df["Percentage"] = (intent_summary_df["Count"] / intent_counts.sum() * 100).round(1)
     
-    return pd.DataFrame(keyword_intents), pd.DataFrame(summary_data)
+    return keyword_intents_df, intent_summary_df
 
 
 # ---------- Keyword Opportunity Scoring ----------
-def calculate_keyword_opportunity_score(
-    keyword: str,
-    frequency: int,
-    total_keywords: int,
-    current_rankings: int = 0
-) -> Dict[str, Any]:
+def _opportunity_components(frequency, total_keywords: int, word_count, current_rankings=0):
     """
-    Calculate an opportunity score for a keyword (0-100).
-    Higher scores = better optimization opportunities.
+    Element-wise opportunity math shared by the scalar helper and the report.
+    Accepts scalars or NumPy arrays; returns
+    (opportunity_score, frequency_score, length_score, ranking_penalty).
     """
+    frequency = np.asarray(frequency, dtype=np.float64)
+    word_count = np.asarray(word_count, dtype=np.int64)  # keeps length_score an int, as before
+    
     # Frequency score (how relevant is it to your site?)
-    frequency_score = min(100, (frequency / total_keywords * 100) * 2) if total_keywords > 0 else 0
+    if total_keywords > 0:
+        frequency_score = np.minimum(100, (frequency / total_keywords * 100) * 2)
+    else:
+        frequency_score = np.zeros_like(frequency)
     
     # Length score (longer phrases often have better conversion)
-    word_count = len(keyword.split())
-    length_score = min(100, word_count * 15)
+    length_score = np.minimum(100, word_count * 15)
     
     # Already ranking adjustment (if already ranking, lower opportunity)
     ranking_penalty = current_rankings * 20
     
     # Combine scores with weights
-    opportunity_score = (frequency_score * 0.4 + length_score * 0.4 - ranking_penalty * 0.2)
-    opportunity_score = max(0, min(100, opportunity_score))
+    opportunity_score = np.clip(frequency_score * 0.4 + length_score * 0.4 - ranking_penalty * 0.2, 0, 100)
+    
+    return opportunity_score, frequency_score, length_score, ranking_penalty
+
+
+def calculate_keyword_opportunity_score(
+    keyword: str,
+    frequency: int,
+    total_keywords: int,
+    current_rankings: int = 0,
+    word_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Calculate an opportunity score for a keyword (0-100).
+    Higher scores = better optimization opportunities.
+    Pass a precomputed word_count to skip re-splitting the keyword.
+    """
+    if word_count is None:
+        word_count = len(keyword.split())
+    opportunity_score, frequency_score, length_score, ranking_penalty = _opportunity_components(
+        frequency, total_keywords, word_count, current_rankings
+    )
+    opportunity_score, frequency_score, length_score = float(opportunity_score), float(frequency_score), int(length_score)
     
     return {
         "keyword": keyword,
@@ -253,6 +336,11 @@ def calculate_keyword_opportunity_score(
     }
 
 
+def _priority_labels(opportunity_score: np.ndarray) -> np.ndarray:
+    """Array form of the High/Medium/Low priority bands above."""
+    return np.select([opportunity_score >= 70, opportunity_score >= 40], ["High", "Medium"], default="Low")
+
+
 # ---------- Keyword Research Report Generation ----------
 def generate_keyword_research_report(
     keywords: List[str],
@@ -269,25 +357,38 @@ def generate_keyword_research_report(
     
     total_keywords = len(keywords)
     
+    # Deduplicate the keyword bag once; every stage below works on
+    # (unique keyword, frequency) pairs instead of the raw list
+    keyword_counts = Counter(keywords)
+    
     # Frequency analysis
-    frequency_df = analyze_keyword_frequency(keywords, top_n=top_n)
+    frequency_df = _frequency_from_counts(keyword_counts, total_keywords, top_n=top_n)
+    frequency_df["Keyword"] = frequency_df["Keyword"].astype(_KEYWORD_DTYPE)
+    
+    # Word counts for the scoring stages, counted once per keyword as
+    # whitespace-separated runs (same result as len(kw.split()) without
+    # allocating a token list per keyword)
+    word_counts = frequency_df["Keyword"].str.count(r"\S+").to_numpy()
     
     # Intent analysis
     intent_keywords_df, intent_summary_df = analyze_keyword_intent_distribution(
         frequency_df["Keyword"].tolist() if not frequency_df.empty else []
     )
     
-    # Opportunity scoring
-    opportunities = []
-    for _, row in frequency_df.iterrows():
-        score = calculate_keyword_opportunity_score(
-            row["Keyword"],
-            int(row["Frequency"]),
-            total_keywords
-        )
-        opportunities.append(score)
+    # Opportunity scoring, computed column-wise over the frequency table
+    keyword_col = frequency_df["Keyword"]
+    opportunity_score, frequency_score, length_score, ranking_penalty = _opportunity_components(
+        frequency_df["Frequency"].to_numpy(), total_keywords, word_counts
+    )
     
-    opportunities_df = pd.DataFrame(opportunities).sort_values("opportunity_score", ascending=False)
+    opportunities_df = pd.DataFrame({
+        "keyword": keyword_col,
+        "opportunity_score": opportunity_score.round(1),
+        "frequency_component": frequency_score.round(1),
+        "length_component": length_score.round(1),
+        "rank_penalty": ranking_penalty,
+        "priority": _priority_labels(opportunity_score),
+    }).sort_values("opportunity_score", ascending=False)
     
     # Clustering
     top_keywords = frequency_df["Keyword"].tolist() if not frequency_df.empty else []
@@ -295,7 +396,7 @@ def generate_keyword_research_report(
     
     return {
         "total_keywords": total_keywords,
-        "unique_keywords": len(set(keywords)),
+        "unique_keywords": len(keyword_counts),
         "frequency_analysis": frequency_df,
         "intent_analysis": intent_keywords_df,
         "intent_summary": intent_summary_df,
@@ -317,8 +418,12 @@ def render_streamlit_keyword_research_ui(st, keywords: List[str]):
         st.warning("⚠️ No keywords available for analysis. Run a crawl first.")
         return
     
-    # Generate report
-    report = generate_keyword_research_report(keywords, top_n=50)
+    # Generate report (cached, so tab switches and widget reruns reuse it)
+    @st.cache_data(show_spinner=False)
+    def _cached_report(keywords_tuple, top_n):
+        return generate_keyword_research_report(list(keywords_tuple), top_n=top_n)
+    
+    report = _cached_report(tuple(keywords), 50)
     
     if "error" in report:
         st.error(f"❌ {report['error']}")
@@ -419,9 +524,13 @@ def render_streamlit_keyword_research_ui(st, keywords: List[str]):
                 variations = generate_keyword_variations(selected_keyword)
                 st.markdown(f"**Variations for:** `{selected_keyword}`")
                 
+                # Label from the same tables that built the list, so the
+                # columns line up whether or not a plural was added
+                question_count = len(_VARIATION_PREFIXES) + len(_VARIATION_SUFFIXES)
+                plural_types = ["Plural"] * (len(variations) - 1 - question_count)
                 var_df = pd.DataFrame({
                     "Variation": variations,
-                    "Type": ["Original"] + ["Plural", "Question", "Question", "Question", "Question", "Question", "Question"]
+                    "Type": ["Original"] + plural_types + ["Question"] * question_count
                 })
                 st.dataframe(var_df, use_container_width=True)
     
@@ -431,12 +540,16 @@ def render_streamlit_keyword_research_ui(st, keywords: List[str]):
     st.markdown("**📥 Export Keyword Research**")
     col1, col2, col3 = st.columns(3)
     
+    # CSV bytes are cached, so reruns don't re-serialize the report frames
+    @st.cache_data(show_spinner=False)
+    def _to_csv(df):
+        return df.to_csv(index=False).encode("utf-8")
+    
     with col1:
         if not report["frequency_analysis"].empty:
-            csv = report["frequency_analysis"].to_csv(index=False)
             st.download_button(
                 "📄 Frequency Data",
-                data=csv,
+                data=_to_csv(report["frequency_analysis"]),
                 file_name="keywords_frequency.csv",
                 mime="text/csv",
                 use_container_width=True
@@ -444,10 +557,9 @@ def render_streamlit_keyword_research_ui(st, keywords: List[str]):
     
     with col2:
         if not report["opportunity_analysis"].empty:
-            csv = report["opportunity_analysis"].to_csv(index=False)
             st.download_button(
                 "📊 Opportunities",
-                data=csv,
+                data=_to_csv(report["opportunity_analysis"]),
                 file_name="keywords_opportunities.csv",
                 mime="text/csv",
                 use_container_width=True
@@ -455,10 +567,9 @@ def render_streamlit_keyword_research_ui(st, keywords: List[str]):
     
     with col3:
         if not report["intent_analysis"].empty:
-            csv = report["intent_analysis"].to_csv(index=False)
             st.download_button(
                 "🎯 Intent Analysis",
-                data=csv,
+                data=_to_csv(report["intent_analysis"]),
                 file_name="keywords_intent.csv",
                 mime="text/csv",
                 use_container_width=True
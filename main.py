@@ -1,7 +1,8 @@
 # seo_crawler_streamlit.py
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 import xml.etree.ElementTree as ET
@@ -9,14 +10,18 @@ import ssl
 import socket
 from datetime import datetime, timedelta, timezone
 import pandas as pd
-import json
-import re
 import time
-import io
+import threading
+import uuid
+from collections import deque
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import organic_research as org
 import site_audit as sa
 import health_score as hs
-from utils import sanitize_for_display
+from utils import build_excel_report, sanitize_for_display
+from page_parser import decode_page, detect_content_type, normalize_url, parse_page, start_worker_pool
 from content_analyzer import render_streamlit_content_analyzer_ui
 
 # ---------------------------
@@ -26,23 +31,70 @@ HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; SEO-Crawler/1.0; +https://exa
 EXTERNAL_CHECK_MAX_LINKS = 50
 EXTERNAL_CHECK_MAX_IMAGES = 30
 EXTERNAL_CHECK_TIMEOUT = 6
-
-def load_robots_for_domain(domain):
+CRAWL_CONCURRENCY = 8
+MAX_PAGE_BYTES = 5 * 1024 * 1024  # page bodies beyond this are cut off
+PROGRESS_UPDATE_INTERVAL = 0.1  # seconds between crawl progress redraws
+# Below two, pages are parsed on the crawl thread: a lone worker process
+# runs no faster and every body would be pickled over to it
+PARSE_WORKERS = min(CRAWL_CONCURRENCY, os.cpu_count() or 1)
+# Sent with crawl page requests only; robots.txt, sitemaps and resource
+# checks share the session and keep its default Accept
+PAGE_ACCEPT = "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"
+# Response types whose body is parsed as a page; anything else (PDFs,
+# images, feeds behind extension-less URLs) is recorded without reading it
+_HTML_MIME_TYPES = frozenset(("text/html", "application/xhtml+xml"))
+# Linked files that are never HTML pages and are not worth downloading
+_BINARY_EXT = frozenset((
+    ".pdf", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".mp4", ".svg",
+    ".css", ".js", ".ico", ".webp",
+))
+
+def _is_crawlable(link):
+    """Whether a discovered internal URL should be queued for fetching."""
+    p = urlparse(link)
+    return p.scheme in ("http", "https") and os.path.splitext(p.path)[1].lower() not in _BINARY_EXT
+
+def load_robots_for_domain(domain, session=None):
+    """Load and parse robots.txt for a scheme://host domain.
+
+    With a session the file is fetched over its pooled keep-alive
+    connections and fed to rp.parse(), mirroring how RobotFileParser.read()
+    treats 401/403 (disallow all) and other 4xx (allow all) responses.
+    """
     rp = RobotFileParser()
     robots_url = f"{domain.rstrip('/')}/robots.txt"
     try:
         rp.set_url(robots_url)
-        rp.read()
+        if session is None:
+            rp.read()
+        else:
+            r = session.get(robots_url, timeout=8)
+            if r.status_code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= r.status_code < 500:
+                rp.allow_all = True
+            elif r.status_code < 400:
+                rp.parse(r.content.decode("utf-8").splitlines())
     except Exception:
         rp = None
     return rp, robots_url
 
-def allowed_by_robots(url, ignore_robots=False):
+def allowed_by_robots(url, ignore_robots=False, robots_cache=None, session=None):
+    """Check url against its domain's robots.txt.
+
+    Pass a robots_cache dict (domain -> (parser, robots_url)) to load each
+    domain's robots.txt only once per crawl instead of once per URL.
+    """
     if ignore_robots:
         return True, None
     parsed = urlparse(url)
     domain = f"{parsed.scheme}://{parsed.netloc}"
-    rp, robots_url = load_robots_for_domain(domain)
+    if robots_cache is None:
+        rp, robots_url = load_robots_for_domain(domain, session)
+    else:
+        if domain not in robots_cache:
+            robots_cache[domain] = load_robots_for_domain(domain, session)
+        rp, robots_url = robots_cache[domain]
     if rp is None:
         return True, robots_url
     try:
@@ -179,11 +231,11 @@ def _probe_url(session, url, timeout=EXTERNAL_CHECK_TIMEOUT):
     except Exception:
         return None, False
 
-def _is_blocked_by_external_robots(url, robots_cache):
+def _is_blocked_by_external_robots(url, robots_cache, session=None):
     parsed = urlparse(url)
     domain = f"{parsed.scheme}://{parsed.netloc}"
     if domain not in robots_cache:
-        rp, _ = load_robots_for_domain(domain)
+        rp, _ = load_robots_for_domain(domain, session)
         robots_cache[domain] = rp
     rp = robots_cache[domain]
     if rp is None:
@@ -217,7 +269,7 @@ def check_external_resources(session, link_urls, image_urls, favicon_candidates,
         status, redirected = _probe_url(session, url)
         result["external_link_status"][url] = status
         result["external_link_redirected"][url] = redirected
-        result["external_link_robots_blocked"][url] = _is_blocked_by_external_robots(url, robots_cache)
+        result["external_link_robots_blocked"][url] = _is_blocked_by_external_robots(url, robots_cache, session)
 
     image_list = sorted(image_urls)
     if len(image_list) > EXTERNAL_CHECK_MAX_IMAGES:
@@ -233,69 +285,6 @@ def check_external_resources(session, link_urls, image_urls, favicon_candidates,
 
     return result
 
-def extract_schema_types(soup):
-    schema_types = []
-    for tag in soup.find_all("script", type="application/ld+json"):
-        try:
-            raw = tag.string
-            if not raw:
-                continue
-            data = json.loads(raw)
-            if isinstance(data, dict):
-                t = data.get("@type") or data.get("type")
-                if isinstance(t, list):
-                    schema_types.extend(t)
-                elif t:
-                    schema_types.append(t)
-            elif isinstance(data, list):
-                for d in data:
-                    if isinstance(d, dict):
-                        t = d.get("@type") or d.get("type")
-                        if t:
-                            schema_types.append(t)
-        except Exception:
-            continue
-    return ", ".join(schema_types)
-
-
-def extract_meta_tag(soup, name=None, property_name=None):
-    if name:
-        tag = soup.find("meta", attrs={"name": name})
-        if tag and tag.get("content"):
-            return tag["content"].strip()
-    if property_name:
-        tag = soup.find("meta", attrs={"property": property_name})
-        if tag and tag.get("content"):
-            return tag["content"].strip()
-    return ""
-
-
-def extract_canonical_url(soup, page_url):
-    canon = soup.find("link", attrs={"rel": "canonical"})
-    href = canon.get("href") if canon and canon.get("href") else ""
-    if href:
-        return normalize_url(urljoin(page_url, href))
-    return ""
-
-def detect_content_type(url, soup):
-    u = url.lower()
-    if re.search(r"/blog/|/news/|/posts/|/articles/", u) or soup.find("article"):
-        return "Blog / Article"
-    if re.search(r"/product/|/shop/|/item/|/store/|/collections/", u):
-        return "Product"
-    if re.search(r"/about|/contact|/service|/services|/pricing|/features", u):
-        return "Landing Page"
-    if soup.find("meta", attrs={"property":"og:type"}) and soup.find("meta", attrs={"property":"og:type"})["content"] == "product":
-        return "Product"
-    return "Other"
-
-def normalize_url(u):
-    if not u:
-        return u
-    u = u.split('#')[0].strip()
-    return u
-
-
 def ensure_result_columns(df):
     if df is None:
         return df
@@ -315,9 +304,176 @@ def ensure_result_columns(df):
 
     return df
 
+def find_duplicates(df, column):
+    """Rows whose non-empty `column` value is shared with another page.
+
+    crawl_site stores Title/Description/H1 already stripped, so a plain
+    non-empty test replaces a per-row .str.strip() pass over the column.
+    """
+    values = df[column].fillna("")
+    return df[values.ne("") & values.duplicated(keep=False)]
+
+def attach_html(df, html_store):
+    """Return a copy of df with an "HTML" column looked up from html_store
+    by URL (empty for redirects, errors and pages without stored HTML)."""
+    out = df.copy()
+    out["HTML"] = [html_store.get(u, "") for u in out["URL"]]
+    return out
+
+# Post-crawl views, cached so widget reruns (filters, tab switches) skip
+# recomputing them. They are keyed by the crawl's id plus any widget state
+# they depend on; underscore-prefixed frames are excluded from Streamlit's
+# argument hashing, so no DataFrame is hashed on each rerun.
+@st.cache_data(show_spinner=False, max_entries=16)
+def crawl_display_view(crawl_id, _df):
+    """Sanitized, categorical, column-ordered copy of the crawl results."""
+    # The low-cardinality label columns become categoricals so the
+    # filters, value_counts and groupbys work on integer codes instead of
+    # comparing strings row by row
+    df_display = sanitize_for_display(_df, max_text_chars=4000)
+    df_display = df_display.astype(
+        {c: "category" for c in ("Status", "Crawl Status", "Content Type", "MIME Type") if c in df_display.columns}
+    )
+    cols_order = ["URL", "Status", "Crawl Status", "Title", "Title Length",
+                  "Description", "Description Length", "H1", "Word Count", "Heading Count", "Image Count",
+                  "Internal Links", "External Links", "Link-to-Word Ratio",
+                  "Schema", "Content Type", "MIME Type", "Canonical URL", "OG Title", "OG Description",
+                  "Crawl Time (s)"]
+    cols_order = [c for c in cols_order if c in df_display.columns] + \
+                 [c for c in df_display.columns if c not in cols_order]
+    return df_display[cols_order]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def crawl_overview(crawl_id, _df_display):
+    """Chart distributions and duplicate-content frames for a crawl."""
+    return {
+        "mime_dist": _df_display["MIME Type"].value_counts(),
+        "content_dist": _df_display["Content Type"].value_counts(),
+        "status_dist": _df_display["Status"].value_counts(),
+        "crawl_time_avg": _df_display.groupby("Content Type", observed=True)["Crawl Time (s)"].mean(),
+        "dup_titles": find_duplicates(_df_display, "Title"),
+        "dup_desc": find_duplicates(_df_display, "Description"),
+        "dup_h1": find_duplicates(_df_display, "H1"),
+    }
+
+# Averaged for the site summary metrics and the Excel summary sheet
+SUMMARY_MEAN_COLUMNS = [
+    "Title Length", "Description Length", "Word Count",
+    "Heading Count", "Image Count", "Crawl Time (s)",
+]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def crawl_summary_means(crawl_id, mime_filter, _df_filtered):
+    """Per-column averages of the MIME-filtered crawl results."""
+    return _df_filtered[SUMMARY_MEAN_COLUMNS].mean()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def export_reports(crawl_id, mime_filter, _df_filtered, _extra_sheets):
+    """(xlsx bytes, CSV text) for the MIME-filtered crawl results."""
+    sheets = {"Crawl Results": sanitize_for_display(_df_filtered, max_text_chars=4000), **_extra_sheets}
+    return build_excel_report(sheets), _df_filtered.to_csv(index=False)
+
 # ---------------------------
 # Core crawler
 # ---------------------------
+@st.cache_resource(show_spinner=False)
+def shared_parse_pool():
+    """Process pool running parse_page(), started once and shared by every crawl."""
+    return start_worker_pool(PARSE_WORKERS)
+
+_parse_pool_lock = threading.Lock()  # crawls in several sessions may find it broken at once
+
+def _submit_parse(parse_pool, parse_args):
+    """Submit parse_page(*parse_args); returns (the pool used, its future).
+
+    A worker that dies (say the OOM killer taking one on a pathological
+    page) breaks its whole pool, and every later submit() raises. The
+    first crawl to hit that swaps a freshly started pool into the shared
+    cache, so the rest of this crawl and every other session carry on.
+    """
+    try:
+        return parse_pool, parse_pool.submit(parse_page, *parse_args)
+    except BrokenProcessPool:
+        with _parse_pool_lock:
+            if shared_parse_pool() is parse_pool:
+                shared_parse_pool.clear()
+                parse_pool.shutdown(wait=False)
+            parse_pool = shared_parse_pool()
+        return parse_pool, parse_pool.submit(parse_page, *parse_args)
+
+def _parse_in_thread(parse_args):
+    """parse_page(*parse_args) run here, as an already completed Future."""
+    future = Future()
+    try:
+        future.set_result(parse_page(*parse_args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def _await_host_turn(url, delay, host_schedule, lock):
+    """Hold a fetch of `url` until its host's next request slot, and take it.
+
+    host_schedule maps netloc -> time.monotonic() its next request may
+    start, shared by every fetch worker of a crawl, so request starts to one
+    host are spaced `delay` apart however many workers are running: the
+    delay bounds the load on the crawled site as it did in the serial loop.
+    """
+    host = urlparse(url).netloc
+    with lock:
+        now = time.monotonic()
+        start = max(now, host_schedule.get(host, now))
+        host_schedule[host] = start + delay
+    if start > now:
+        time.sleep(start - now)
+
+def _fetch_page(session, url, delay, host_schedule, lock):
+    """Fetch one crawl URL on a worker thread; returns (response, body, crawl_time).
+
+    The body is streamed and kept to at most MAX_PAGE_BYTES, so a huge page
+    or a stray archive link can't balloon memory; past the cap the rest is
+    dropped along with the connection, and the prefix is parsed as usual.
+    Redirects, error statuses and successful responses declaring a
+    non-HTML Content-Type are closed unread and come back with body None;
+    only their status and headers are reported.
+    The request waits for its host's turn first (see _await_host_turn);
+    crawl_time counts from when it is sent.
+    """
+    _await_host_turn(url, delay, host_schedule, lock)
+    start_time = time.time()
+    r = session.get(url, timeout=12, allow_redirects=False, stream=True, headers={"Accept": PAGE_ACCEPT})
+    with r:
+        mime = r.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if r.status_code >= 300 or (mime and mime not in _HTML_MIME_TYPES):
+            return r, None, round(time.time() - start_time, 2)
+        chunks, size = [], 0
+        for chunk in r.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > MAX_PAGE_BYTES:
+                break
+        body = b"".join(chunks)[:MAX_PAGE_BYTES]
+    return r, body, round(time.time() - start_time, 2)  # seconds
+
+# Response headers reported for every successful fetch, parsed or not; the
+# security, performance and crawlability checks read them off the row
+REPORTED_HEADERS = (
+    "Content-Encoding", "Strict-Transport-Security", "X-Content-Type-Options",
+    "X-Frame-Options", "Content-Security-Policy", "Cache-Control", "X-Robots-Tag",
+)
+
+def _header_columns(r):
+    return {name: r.headers.get(name, "") for name in REPORTED_HEADERS}
+
+def _error_row(url, e):
+    return {
+        "URL": url, "Status": "Error", "Crawl Status": f"Error: {e}",
+        "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
+        "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
+        "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0, "Schema": "", "Content Type": "", "MIME Type": "",
+        "Canonical URL": "", "OG Title": "", "OG Description": "",
+        "Crawl Time (s)": 0
+    }
+
 def crawl_site(seed_url, max_pages=100, delay=0.5, ignore_robots=False, show_progress_cb=None, check_external_links=False):
     seed_url = seed_url.rstrip('/')
     parsed_seed = urlparse(seed_url)
@@ -326,164 +482,221 @@ def crawl_site(seed_url, max_pages=100, delay=0.5, ignore_robots=False, show_pro
     base = f"{scheme}://{seed_domain}"
 
     visited = set()
-    to_visit = [seed_url]
+    # Page HTML is kept out of the results frame, keyed by URL, so display
+    # copies, filters and exports never carry it; see attach_html()
+    html_store = {}
+    to_visit = deque([seed_url])
+    queued = {seed_url}  # every URL ever put on to_visit, for O(1) dedup
     results = []
     external_link_urls = set()
     image_urls = set()
     favicon_candidates = []
 
+    # Keep-alive pools sized for every crawl worker, so sockets (and their
+    # TLS sessions) to the site are reused rather than re-handshaked.
+    # robots.txt, the sitemap and the external-link probes use `session`;
+    # crawled pages go through `page_session`, where a couple of backed-off
+    # retries absorb transient 429/5xx responses. Probes stay single-shot,
+    # so a dead external link costs one timeout and its status is reported
+    # as first seen
     session = requests.Session()
     session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_maxsize=CRAWL_CONCURRENCY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    page_session = requests.Session()
+    page_session.headers.update(HEADERS)
+    page_adapter = HTTPAdapter(
+        pool_maxsize=CRAWL_CONCURRENCY,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        ),
+    )
+    page_session.mount("https://", page_adapter)
+    page_session.mount("http://", page_adapter)
 
     site_ctx = fetch_site_context(base, session)
 
-    while to_visit and len(visited) < max_pages:
-        url = to_visit.pop(0)
-        url = normalize_url(url)
-        if not url or url in visited:
-            continue
-
-        allowed, robots_url = allowed_by_robots(url, ignore_robots=ignore_robots)
-        if not allowed:
-            return pd.DataFrame(), {"blocked": True, "robots_url": robots_url, "site_ctx": site_ctx}
-
-        if show_progress_cb:
-            show_progress_cb(min(len(visited)/max_pages, 1.0), f"Crawling: {url}")
-
-        try:
-            start_time = time.time()
-            r = session.get(url, timeout=12, allow_redirects=False)
-            crawl_time = round(time.time() - start_time, 2)  # seconds
-            status_code = r.status_code
-
-            if 300 <= status_code < 400:
-                redirect_target = normalize_url(urljoin(url, r.headers.get("Location", "")))
-                results.append({
-                    "URL": url, "Status": str(status_code), "Crawl Status": "Redirect",
-                    "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
-                    "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
-                    "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0,
-                    "Schema": "", "Content Type": "", "MIME Type": r.headers.get("Content-Type", ""),
-                    "Canonical URL": "", "OG Title": "", "OG Description": "", "Crawl Time (s)": crawl_time,
-                    "HTML": "", "Content Text": "", "Redirect Target": redirect_target
-                })
-                visited.add(url)
-                if redirect_target and redirect_target not in visited and redirect_target not in to_visit:
-                    p = urlparse(redirect_target)
-                    if p.scheme in ("http", "https"):
-                        to_visit.append(redirect_target)
-                time.sleep(delay)
-                continue
-
-            if status_code >= 400:
-                results.append({
-                    "URL": url, "Status": str(status_code), "Crawl Status": "HTTP Error",
-                    "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
-                    "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
-                    "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0,
-                    "Schema": "", "Content Type": "", "MIME Type": r.headers.get("Content-Type", ""),
-                    "Canonical URL": "", "OG Title": "", "OG Description": "", "Crawl Time (s)": crawl_time,
-                    "HTML": "", "Content Text": ""
-                })
-                visited.add(url)
-                time.sleep(delay)
-                continue
-
-            soup = BeautifulSoup(r.text, "lxml")
-            title = (soup.title.string.strip() if soup.title and soup.title.string else "")
-            desc_tag = soup.find("meta", attrs={"name": "description"})
-            desc = desc_tag["content"].strip() if desc_tag and desc_tag.get("content") else ""
-
-            h_tags = {f"h{i}": [h.get_text(" ", strip=True) for h in soup.find_all(f"h{i}")] for i in range(1,7)}
-            h1 = h_tags["h1"][0] if h_tags["h1"] else ""
-
-            anchors = []
-            internal_links, external_links = [], []
-            for a in soup.find_all("a", href=True):
-                href = normalize_url(urljoin(url, a.get("href")))
-                if not href:
+    # robots.txt parsers per domain for this crawl, seeded from the copy
+    # fetch_site_context() already downloaded for the site itself
+    robots_cache = {}
+    if site_ctx["robots_txt"] is not None:
+        rp = RobotFileParser(site_ctx["robots_txt_url"])
+        rp.parse(site_ctx["robots_txt"].splitlines())
+        robots_cache[base] = (rp, site_ctx["robots_txt_url"])
+
+    # Fetches run on a small thread pool so network round-trips overlap,
+    # and on multi-core hosts HTML bodies are parsed by parse_page() on the
+    # server's shared process pool so pages are parsed on several cores in
+    # parallel. Dispatch, robots checks, progress updates and result
+    # bookkeeping all stay on this thread, so they need no locking.
+    pool = ThreadPoolExecutor(max_workers=CRAWL_CONCURRENCY)
+    host_schedule, host_schedule_lock = {}, threading.Lock()  # see _await_host_turn
+    parse_pool = shared_parse_pool() if PARSE_WORKERS > 1 else None
+    in_flight = {}  # fetch future -> (dispatch seq, url)
+    parsing = {}    # parse future -> (seq, url, response, HTML excerpt, crawl_time, parse_args, retried)
+    # Fetches and parses complete in any order, but each page is committed
+    # (its row recorded, its links queued) in dispatch order, as the serial
+    # breadth-first loop did; so which pages fit in max_pages, the crawl
+    # order and the row order are the same from one run to the next
+    dispatched = set()
+    finished = {}   # seq -> (url, row, links to queue, parse_page() output or None)
+    next_commit = 0
+    try:
+        while to_visit or in_flight or parsing:
+            while to_visit and len(in_flight) < CRAWL_CONCURRENCY and len(dispatched) < max_pages:
+                url = normalize_url(to_visit.popleft())
+                if not url or url in dispatched:
                     continue
-                anchors.append({"href": href, "text": a.get_text(" ", strip=True)})
-                parsed = urlparse(href)
-                if parsed.netloc == seed_domain:
-                    internal_links.append(href)
-                else:
-                    external_links.append(href)
-
-            text = soup.get_text(" ", strip=True)
-            word_count = len(text.split())
-            heading_count = sum(1 for _ in soup.find_all(re.compile(r"^h[1-6]$")))
-            image_count = len(soup.find_all("img"))
-            total_links = len(internal_links) + len(external_links)
-            link_to_word = round(total_links / word_count, 3) if word_count else 0
-
-            if check_external_links:
-                external_link_urls.update(external_links)
-                for img in soup.find_all("img", src=True):
-                    img_src = normalize_url(urljoin(url, img.get("src")))
-                    if img_src:
-                        image_urls.add(img_src)
-                for link_tag in soup.find_all("link", rel=True):
-                    rel = link_tag.get("rel")
-                    rel_str = " ".join(rel) if isinstance(rel, list) else str(rel)
-                    if "icon" in rel_str.lower() and link_tag.get("href"):
-                        favicon_candidates.append(normalize_url(urljoin(url, link_tag.get("href"))))
-
-            schema = extract_schema_types(soup)
-            content_type = detect_content_type(url, soup)
-            mime_type = r.headers.get("Content-Type", "")
-            canonical_url = extract_canonical_url(soup, url)
-            og_title = extract_meta_tag(soup, property_name="og:title")
-            og_description = extract_meta_tag(soup, property_name="og:description")
-
-            html_excerpt = r.text if len(r.text) <= 12000 else r.text[:12000] + "… [truncated]"
-            content_text = soup.get_text(" ", strip=True)
-            results.append({
-                "URL": url, "Status": str(status_code), "Crawl Status": "Success",
-                "Title": title, "Title Length": len(title),
-                "Description": desc, "Description Length": len(desc),
-                "H1": h1, "H Tags": json.dumps(h_tags, ensure_ascii=False),
-                "Word Count": word_count, "Heading Count": heading_count, "Image Count": image_count,
-                "Internal Links": len(set(internal_links)),
-                "External Links": len(set(external_links)), "Link-to-Word Ratio": link_to_word,
-                "Schema": schema, "Content Type": content_type, "MIME Type": mime_type,
-                "Canonical URL": canonical_url, "OG Title": og_title, "OG Description": og_description,
-                "Crawl Time (s)": crawl_time, "HTML": html_excerpt, "Content Text": content_text,
-                "Content-Encoding": r.headers.get("Content-Encoding", ""),
-                "Strict-Transport-Security": r.headers.get("Strict-Transport-Security", ""),
-                "X-Content-Type-Options": r.headers.get("X-Content-Type-Options", ""),
-                "X-Frame-Options": r.headers.get("X-Frame-Options", ""),
-                "Content-Security-Policy": r.headers.get("Content-Security-Policy", ""),
-                "Cache-Control": r.headers.get("Cache-Control", ""),
-                "X-Robots-Tag": r.headers.get("X-Robots-Tag", "")
-            })
-
-            for link in internal_links:
-                if link not in visited and link not in to_visit:
-                    p = urlparse(link)
-                    if p.scheme in ("http", "https"):
-                        to_visit.append(link)
 
-            visited.add(url)
-            time.sleep(delay)
-
-        except Exception as e:
-            results.append({
-                "URL": url, "Status": "Error", "Crawl Status": f"Error: {e}",
-                "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
-                "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
-                "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0, "Schema": "", "Content Type": "", "MIME Type": "",
-                "Canonical URL": "", "OG Title": "", "OG Description": "",
-                "Crawl Time (s)": 0, "HTML": ""
-            })
-            visited.add(url)
-            time.sleep(delay)
-            continue
+                allowed, robots_url = allowed_by_robots(url, ignore_robots=ignore_robots, robots_cache=robots_cache, session=session)
+                if not allowed:
+                    return pd.DataFrame(), {"blocked": True, "robots_url": robots_url, "site_ctx": site_ctx}, {}
+
+                if show_progress_cb:
+                    show_progress_cb(min(len(visited)/max_pages, 1.0), f"Crawling: {url}")
+
+                in_flight[pool.submit(_fetch_page, page_session, url, delay, host_schedule, host_schedule_lock)] = (len(dispatched), url)
+                dispatched.add(url)
+
+            if not in_flight and not parsing:
+                break
+
+            done, _ = wait([*in_flight, *parsing], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    seq, url, r, html_excerpt, crawl_time, parse_args, retried = parsing.pop(future)
+                    if not retried and isinstance(future.exception(), BrokenProcessPool):
+                        # Its worker pool broke under this parse or another
+                        # one in flight; each such page gets one more try on
+                        # a fresh pool, so only a page that breaks that one
+                        # too (with whatever it shares it with) is lost
+                        try:
+                            parse_pool, parsed_future = _submit_parse(parse_pool, parse_args)
+                        except BrokenProcessPool as e:
+                            finished[seq] = (url, _error_row(url, e), (), None)
+                            continue
+                        parsing[parsed_future] = (seq, url, r, html_excerpt, crawl_time, parse_args, True)
+                        continue
+                    try:
+                        parsed = future.result()
+                        fields = parsed["fields"]
+                        html_store[url] = html_excerpt
+                        row = {
+                            "URL": url, "Status": str(r.status_code), "Crawl Status": "Success",
+                            "Title": fields["Title"], "Title Length": fields["Title Length"],
+                            "Description": fields["Description"], "Description Length": fields["Description Length"],
+                            "H1": fields["H1"], "H Tags": fields["H Tags"],
+                            "Word Count": fields["Word Count"], "Heading Count": fields["Heading Count"],
+                            "Image Count": fields["Image Count"],
+                            "Internal Links": fields["Internal Links"],
+                            "External Links": fields["External Links"], "Link-to-Word Ratio": fields["Link-to-Word Ratio"],
+                            "Schema": fields["Schema"], "Content Type": fields["Content Type"],
+                            "MIME Type": r.headers.get("Content-Type", ""),
+                            "Canonical URL": fields["Canonical URL"], "OG Title": fields["OG Title"],
+                            "OG Description": fields["OG Description"],
+                            "Crawl Time (s)": crawl_time, "Content Text": fields["Content Text"],
+                            **_header_columns(r)
+                        }
+                        finished[seq] = (url, row, parsed["internal_links"], parsed)
+                    except Exception as e:
+                        finished[seq] = (url, _error_row(url, e), (), None)
+                    continue
+
+                seq, url = in_flight.pop(future)
+                try:
+                    r, body, crawl_time = future.result()
+                    status_code = r.status_code
+
+                    if 300 <= status_code < 400:
+                        redirect_target = normalize_url(urljoin(url, r.headers.get("Location", "")))
+                        finished[seq] = (url, {
+                            "URL": url, "Status": str(status_code), "Crawl Status": "Redirect",
+                            "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
+                            "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
+                            "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0,
+                            "Schema": "", "Content Type": "", "MIME Type": r.headers.get("Content-Type", ""),
+                            "Canonical URL": "", "OG Title": "", "OG Description": "", "Crawl Time (s)": crawl_time,
+                            "Content Text": "", "Redirect Target": redirect_target
+                        }, (redirect_target,) if redirect_target else (), None)
+                        continue
+
+                    if status_code >= 400:
+                        finished[seq] = (url, {
+                            "URL": url, "Status": str(status_code), "Crawl Status": "HTTP Error",
+                            "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
+                            "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
+                            "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0,
+                            "Schema": "", "Content Type": "", "MIME Type": r.headers.get("Content-Type", ""),
+                            "Canonical URL": "", "OG Title": "", "OG Description": "", "Crawl Time (s)": crawl_time,
+                            "Content Text": ""
+                        }, (), None)
+                        continue
+
+                    if body is None:
+                        finished[seq] = (url, {
+                            "URL": url, "Status": str(status_code), "Crawl Status": "Success",
+                            "Title": "", "Title Length": 0, "Description": "", "Description Length": 0,
+                            "H1": "", "H Tags": "", "Word Count": 0, "Heading Count": 0, "Image Count": 0,
+                            "Internal Links": 0, "External Links": 0, "Link-to-Word Ratio": 0,
+                            "Schema": "",
+                            # Classified from the URL alone, with nothing parsed from the body
+                            "Content Type": detect_content_type(url, {"has_article": False, "meta_property": {}}),
+                            "MIME Type": r.headers.get("Content-Type", ""),
+                            "Canonical URL": "", "OG Title": "", "OG Description": "", "Crawl Time (s)": crawl_time,
+                            "Content Text": "",
+                            **_header_columns(r)
+                        }, (), None)
+                        continue
+
+                    text = decode_page(r.headers.get("Content-Type", ""), body)
+                    html_excerpt = text if len(text) <= 12000 else text[:12000] + "… [truncated]"
+                    parse_args = (url, body, r.headers.get("Content-Type", ""), seed_domain, base)
+                    if parse_pool is None or not body or body.isspace():
+                        # Empty 200/204 bodies have no tree to build; their
+                        # fields are taken here rather than through a pickling
+                        # round trip to the parse pool
+                        parsed_future = _parse_in_thread(parse_args)
+                    else:
+                        parse_pool, parsed_future = _submit_parse(parse_pool, parse_args)
+                    parsing[parsed_future] = (seq, url, r, html_excerpt, crawl_time, parse_args, False)
+
+                except Exception as e:
+                    finished[seq] = (url, _error_row(url, e), (), None)
+
+            while next_commit in finished:
+                url, row, links, parsed = finished.pop(next_commit)
+                next_commit += 1
+                results.append(row)
+                visited.add(url)
+                if parsed is not None and check_external_links:
+                    external_link_urls.update(parsed["external_links"])
+                    image_urls.update(parsed["image_urls"])
+                    favicon_candidates.extend(parsed["favicon_candidates"])
+                for link in links:
+                    if link not in visited and link not in queued and _is_crawlable(link):
+                        to_visit.append(link)
+                        queued.add(link)
+
+    finally:
+        # Also reached when the loop is cut short: the robots.txt block
+        # above, an unexpected error, or Streamlit raising its rerun/stop
+        # exception out of show_progress_cb. Queued work is dropped; the
+        # parse pool outlives the crawl, so only this crawl's parses are
+        # cancelled
+        pool.shutdown(wait=False, cancel_futures=True)
+        for parsed_future in parsing:
+            parsed_future.cancel()
 
     if check_external_links:
         site_ctx.update(check_external_resources(session, external_link_urls, image_urls, favicon_candidates, base))
 
-    return pd.DataFrame(results), {"blocked": False, "site_ctx": site_ctx}
+    return pd.DataFrame(results), {"blocked": False, "site_ctx": site_ctx}, html_store
 
 # ---------------------------
 # Streamlit UI
@@ -666,6 +879,10 @@ if "crawl_results" not in st.session_state:
     st.session_state.crawl_results = None
 if "crawl_metadata" not in st.session_state:
     st.session_state.crawl_metadata = None
+if "crawl_html" not in st.session_state:
+    st.session_state.crawl_html = {}
+if "crawl_id" not in st.session_state:
+    st.session_state.crawl_id = None
 if "active_page" not in st.session_state:
     st.session_state.active_page = "home"
 
@@ -690,7 +907,16 @@ if run_button:
     if not seed_url.startswith("http"):
         st.error("❌ Please provide a valid URL starting with http:// or https://")
     else:
+        # Each update is two deltas sent to the browser; with several
+        # fetches in flight URLs are dispatched faster than it is worth
+        # redrawing, so updates are spaced PROGRESS_UPDATE_INTERVAL apart
+        last_progress_update = {"at": float("-inf")}
+
         def show_progress(pct, message):
+            now = time.monotonic()
+            if now - last_progress_update["at"] < PROGRESS_UPDATE_INTERVAL:
+                return
+            last_progress_update["at"] = now
             try:
                 progress_bar.progress(min(max(pct, 0.0), 1.0))
             except Exception:
@@ -698,11 +924,15 @@ if run_button:
             status_text.markdown(f"⏳ **{message}**")
 
         status_area.info("🔍 Preparing to crawl...")
-        df, meta = crawl_site(seed_url, max_pages=max_pages, delay=delay, ignore_robots=ignore_robots, show_progress_cb=show_progress, check_external_links=check_external_links)
+        df, meta, html_store = crawl_site(seed_url, max_pages=max_pages, delay=delay, ignore_robots=ignore_robots, show_progress_cb=show_progress, check_external_links=check_external_links)
         
         # Store results in session state for persistence across reruns
         st.session_state.crawl_results = df
         st.session_state.crawl_metadata = meta
+        st.session_state.crawl_html = html_store
+        # Cache key for the derived views; unique across sessions, which
+        # share Streamlit's data cache
+        st.session_state.crawl_id = uuid.uuid4().hex
         st.rerun()
 
 # Display results from session state if available
@@ -734,19 +964,9 @@ if st.session_state.crawl_results is not None:
         
         st.markdown("---")
 
-        df_display = sanitize_for_display(
-            df.copy(),
-            drop_columns=["HTML"],
-            max_text_chars=4000,
-        )
-        cols_order = ["URL", "Status", "Crawl Status", "Title", "Title Length",
-                      "Description", "Description Length", "H1", "Word Count", "Heading Count", "Image Count",
-                      "Internal Links", "External Links", "Link-to-Word Ratio",
-                      "Schema", "Content Type", "MIME Type", "Canonical URL", "OG Title", "OG Description",
-                      "Crawl Time (s)"]
-        cols_order = [c for c in cols_order if c in df_display.columns] + \
-                     [c for c in df_display.columns if c not in cols_order]
-        df_display = df_display[cols_order]
+        crawl_id = st.session_state.crawl_id
+        df_display = crawl_display_view(crawl_id, df)
+        overview = crawl_overview(crawl_id, df_display)
 
         # Crawl Results with tabs
         st.subheader("📋 Crawl Results")
@@ -792,41 +1012,30 @@ if st.session_state.crawl_results is not None:
         
         with chart_col1:
             st.markdown("**MIME Type Distribution**")
-            mime_dist = df_display["MIME Type"].value_counts()
-            st.bar_chart(mime_dist)
+            st.bar_chart(overview["mime_dist"])
         
         with chart_col2:
             st.markdown("**Content Type Distribution**")
-            content_dist = df_display["Content Type"].value_counts()
-            st.bar_chart(content_dist)
+            st.bar_chart(overview["content_dist"])
         
         # Additional charts
         chart_col3, chart_col4 = st.columns(2)
         
         with chart_col3:
             st.markdown("**HTTP Status Codes**")
-            status_dist = df_display["Status"].value_counts()
-            st.bar_chart(status_dist)
+            st.bar_chart(overview["status_dist"])
         
         with chart_col4:
             st.markdown("**Average Crawl Time by Content Type**")
-            crawl_time_avg = df_display.groupby("Content Type")["Crawl Time (s)"].mean()
-            st.bar_chart(crawl_time_avg)
+            st.bar_chart(overview["crawl_time_avg"])
 
         # Duplicate detection
         st.subheader("🔁 Duplicate Content Detection")
         st.markdown("Identify pages with duplicate titles, descriptions, and H1 tags.")
         
-        df_dup = df_display.fillna("")
-        dup_titles = df_dup[
-            df_dup.duplicated("Title", keep=False) & df_dup["Title"].str.strip().astype(bool)
-        ]
-        dup_desc = df_dup[
-        df_dup.duplicated("Description", keep=False) & df_dup["Description"].str.strip().astype(bool)
-        ]
-        dup_h1 = df_dup[
-        df_dup.duplicated("H1", keep=False) & df_dup["H1"].str.strip().astype(bool)
-        ]
+        dup_titles = overview["dup_titles"]
+        dup_desc = overview["dup_desc"]
+        dup_h1 = overview["dup_h1"]
         
         col1, col2, col3 = st.columns(3)
 
@@ -859,12 +1068,9 @@ if st.session_state.crawl_results is not None:
 
         st.markdown("---")
 
-        # df_filtered has HTML dropped/truncated for on-screen display; the
-        # analysis tabs below need the real HTML, so re-attach it from df
-        # (same row alignment as df_filtered, since sanitize_for_display only
-        # drops/shortens columns, never rows).
-        df_analysis = df_filtered.copy()
-        df_analysis["HTML"] = df.loc[df_filtered.index, "HTML"]
+        # The crawl results carry no HTML; the analysis tabs below need it,
+        # so attach it to the filtered rows from the out-of-band store.
+        df_analysis = attach_html(df_filtered, st.session_state.crawl_html)
 
         # Main Analysis Tabs
         analysis_tab1, analysis_tab2, analysis_tab3 = st.tabs([
@@ -888,15 +1094,15 @@ if st.session_state.crawl_results is not None:
         st.subheader("📈 Site Summary & Metrics")
         summary_col1, summary_col2, summary_col3, summary_col4 = st.columns(4)
         
-        summary_df = ensure_result_columns(df_filtered.copy())
+        means = crawl_summary_means(crawl_id, tuple(selected_mime), df_filtered)
         with summary_col1:
-            st.metric("Avg Title Length", f"{int(summary_df['Title Length'].mean())} chars")
+            st.metric("Avg Title Length", f"{int(means['Title Length'])} chars")
         with summary_col2:
-            st.metric("Avg Meta Length", f"{int(summary_df['Description Length'].mean())} chars")
+            st.metric("Avg Meta Length", f"{int(means['Description Length'])} chars")
         with summary_col3:
-            st.metric("Avg Word Count", f"{int(summary_df['Word Count'].mean())} words")
+            st.metric("Avg Word Count", f"{int(means['Word Count'])} words")
         with summary_col4:
-            st.metric("Avg Crawl Time", f"{round(summary_df['Crawl Time (s)'].mean(), 2)}s")
+            st.metric("Avg Crawl Time", f"{round(means['Crawl Time (s)'], 2)}s")
 
         st.caption("Additional metrics captured: heading count, image count, canonical URL, OG title, and OG description.")
 
@@ -904,40 +1110,35 @@ if st.session_state.crawl_results is not None:
 
         # Excel export
         st.subheader("📥 Export Reports")
-        towrite = io.BytesIO()
-        with pd.ExcelWriter(towrite, engine="xlsxwriter") as writer:
-            export_df = sanitize_for_display(df_filtered, drop_columns=["HTML"], max_text_chars=4000)
-            export_df.to_excel(writer, sheet_name="Crawl Results", index=False)
-            if not dup_titles.empty:
-                dup_titles.to_excel(writer, sheet_name="Duplicate Titles", index=False)
-            if not dup_desc.empty:
-                dup_desc.to_excel(writer, sheet_name="Duplicate Descriptions", index=False)
-            if not dup_h1.empty:
-                dup_h1.to_excel(writer, sheet_name="Duplicate H1s", index=False)
-            summary = {
-                "Pages Crawled": [len(summary_df)],
-                "Avg Title Length": [int(summary_df['Title Length'].mean())],
-                "Avg Description Length": [int(summary_df['Description Length'].mean())],
-                "Avg Word Count": [int(summary_df['Word Count'].mean())],
-                "Avg Heading Count": [round(summary_df['Heading Count'].mean(), 1)],
-                "Avg Image Count": [round(summary_df['Image Count'].mean(), 1)],
-                "Avg Crawl Time (s)": [round(summary_df['Crawl Time (s)'].mean(), 2)]
-            }
-            pd.DataFrame(summary).to_excel(writer, sheet_name="Summary", index=False)
-            writer.close()
-        towrite.seek(0)
+        sheets = {}
+        if not dup_titles.empty:
+            sheets["Duplicate Titles"] = dup_titles
+        if not dup_desc.empty:
+            sheets["Duplicate Descriptions"] = dup_desc
+        if not dup_h1.empty:
+            sheets["Duplicate H1s"] = dup_h1
+        summary = {
+            "Pages Crawled": [len(df_filtered)],
+            "Avg Title Length": [int(means['Title Length'])],
+            "Avg Description Length": [int(means['Description Length'])],
+            "Avg Word Count": [int(means['Word Count'])],
+            "Avg Heading Count": [round(means['Heading Count'], 1)],
+            "Avg Image Count": [round(means['Image Count'], 1)],
+            "Avg Crawl Time (s)": [round(means['Crawl Time (s)'], 2)]
+        }
+        sheets["Summary"] = pd.DataFrame(summary)
+        excel_report, csv_data = export_reports(crawl_id, tuple(selected_mime), df_filtered, sheets)
         
         col1, col2 = st.columns(2)
         with col1:
             st.download_button(
                 label="📊 Download Excel Report",
-                data=towrite.getvalue(),
+                data=excel_report,
                 file_name="seo_crawl_report.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 width="stretch"
             )
         with col2:
-            csv_data = df_filtered.to_csv(index=False)
             st.download_button(
                 label="📄 Download CSV",
                 data=csv_data,
@@ -0,0 +1,409 @@
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from email.message import Message
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
+
+import lxml.html
+from lxml import etree
+
+# orjson is an optional speedup for decoding JSON-LD blocks. H Tags stays
+# on json.dumps: orjson only writes compact JSON, and the column goes out
+# as-is in the CSV/Excel exports in its ", " / ": " layout
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Text nodes BeautifulSoup's get_text() would yield: script/style/template
+# bodies and comments are not page text
+_TEXT_NODES = etree.XPath(
+    "descendant-or-self::text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+)
+
+@lru_cache(maxsize=None)
+def _html_parser(encoding):
+    return lxml.html.HTMLParser(encoding=encoding)
+
+def parse_html(content, encoding=None):
+    """Parse raw HTML bytes with lxml and return the document's <html> root.
+
+    `encoding` is the charset to decode with (None lets libxml2 sniff it).
+    Codec names libxml2 doesn't know are transcoded to UTF-8 in Python the
+    way requests' r.text would decode them, and empty documents (which lxml
+    refuses to parse) yield an empty <html> root so lookups always work.
+    """
+    try:
+        parser = _html_parser(encoding)
+    except LookupError:
+        try:
+            content = content.decode(encoding, errors="replace").encode("utf-8")
+        except LookupError:
+            content = content.decode("utf-8", errors="replace").encode("utf-8")
+        parser = _html_parser("utf-8")
+    try:
+        return lxml.html.document_fromstring(content, parser=parser)
+    except etree.ParserError:
+        return lxml.html.document_fromstring("<html></html>")
+
+# A charset declared by the document itself (<meta charset>, http-equiv, or
+# an XML declaration), looked for in the first 1024 bytes like browsers do
+_DOC_CHARSET_RE = re.compile(rb"<meta[^>]+charset|<\?xml[^>]+encoding", re.IGNORECASE)
+_DOC_CHARSET_VALUE_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)|<\?xml[^>]+encoding\s*=\s*["']([\w.:-]+)""",
+    re.IGNORECASE,
+)
+
+def response_charset(content_type, body):
+    """Charset to decode a crawled page with, without statistical detection.
+
+    The Content-Type charset wins; otherwise None lets libxml2 honour the
+    document's own declaration. Pages declaring neither are read as UTF-8
+    if they are valid UTF-8 and as windows-1252 (the superset of the
+    ISO-8859-1 requests' r.text assumed for them) if not; no statistical
+    detection like r.apparent_encoding is run.
+    """
+    msg = Message()
+    msg["Content-Type"] = content_type
+    charset = msg.get_content_charset()
+    if charset:
+        return charset
+    if _DOC_CHARSET_RE.search(body, 0, 1024):
+        return None
+    try:
+        body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A body cut off at MAX_PAGE_BYTES may end mid-character, so a bad
+        # tail after non-ASCII text that decoded cleanly still reads as UTF-8
+        if e.end < len(body) or body[:e.start].isascii():
+            return "windows-1252"
+    return "utf-8"
+
+def decode_page(content_type, body):
+    """Decode crawled page bytes with the charset parse_page reads them in.
+
+    Where response_charset defers to the document, its declared charset is
+    used; unknown codec names fall back to UTF-8.
+    """
+    charset = response_charset(content_type, body)
+    if charset is None:
+        m = _DOC_CHARSET_VALUE_RE.search(body, 0, 1024)
+        charset = (m.group(1) or m.group(2)).decode("ascii") if m else "utf-8"
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def text_chunks(el):
+    """Stripped, non-empty text nodes of an lxml element, in document order."""
+    return [s for s in (t.strip() for t in _TEXT_NODES(el)) if s]
+
+def element_text(el):
+    """Equivalent of BeautifulSoup's get_text(" ", strip=True) for an lxml element."""
+    return " ".join(text_chunks(el))
+
+# <noscript> fallbacks aren't content of a page as rendered either
+_VISIBLE_TEXT_NODES = etree.XPath(
+    "descendant-or-self::text()[not(ancestor::script or ancestor::style"
+    " or ancestor::template or ancestor::noscript)]"
+)
+
+@lru_cache(maxsize=4)
+def strip_html(content):
+    """Visible text of an HTML (or plain-text) string, whitespace-collapsed.
+
+    Cached on the string itself: Streamlit reruns hand the same pasted
+    content back on every widget change. The cache holds whole documents
+    for the life of the server, so it is kept to the last few.
+    """
+    tree = parse_html(content.encode("utf-8", errors="replace"), "utf-8")
+    return " ".join(word for t in _VISIBLE_TEXT_NODES(tree) for word in t.split())
+
+_HEADING_TAGS = tuple(f"h{i}" for i in range(1, 7))
+_SCAN_TAGS = ("title", "meta", "link", "script", "article", "img", "a") + _HEADING_TAGS
+
+def scan_page(tree):
+    """Collect everything crawl_site reads from a page in a single walk.
+
+    lxml's iter() filters on the tag list in C, so this replaces a separate
+    full-tree traversal per lookup (title, each meta, each heading level,
+    anchors, images, link tags, JSON-LD, <article>) with one pass. First-match
+    lookups keep the first element in document order, as find() did.
+    """
+    page = {
+        "title": None,
+        "meta_name": {},       # name attribute -> content of its first <meta>
+        "meta_property": {},   # property attribute -> content of its first <meta>
+        "canonical_href": None,
+        "icon_hrefs": [],
+        "ld_json": [],
+        "has_article": False,
+        "image_count": 0,
+        "image_srcs": [],
+        "anchors": [],         # raw href of every <a href>
+        "h_tags": {tag: [] for tag in _HEADING_TAGS},
+    }
+    h_tags = page["h_tags"]
+    for el in tree.iter(*_SCAN_TAGS):
+        tag = el.tag
+        if tag == "a":
+            href = el.get("href")
+            if href is not None:
+                page["anchors"].append(href)
+        elif tag in h_tags:
+            h_tags[tag].append(element_text(el))
+        elif tag == "meta":
+            if el.get("name") is not None:
+                page["meta_name"].setdefault(el.get("name"), el.get("content"))
+            if el.get("property") is not None:
+                page["meta_property"].setdefault(el.get("property"), el.get("content"))
+        elif tag == "img":
+            page["image_count"] += 1
+            if el.get("src") is not None:
+                page["image_srcs"].append(el.get("src"))
+        elif tag == "link":
+            rel = el.get("rel")
+            if rel is None:
+                continue
+            if page["canonical_href"] is None and "canonical" in rel.split():
+                page["canonical_href"] = el.get("href") or ""
+            if "icon" in rel.lower() and el.get("href"):
+                page["icon_hrefs"].append(el.get("href"))
+        elif tag == "script":
+            if el.get("type") == "application/ld+json":
+                page["ld_json"].append(el.text)
+        elif tag == "title":
+            if page["title"] is None:
+                page["title"] = (el.text or "").strip()
+        elif tag == "article":
+            page["has_article"] = True
+    return page
+
+def extract_schema_types(ld_json_blocks):
+    schema_types = []
+    for raw in ld_json_blocks:
+        try:
+            if not raw:
+                continue
+            data = _json_loads(raw)
+            if isinstance(data, dict):
+                t = data.get("@type") or data.get("type")
+                if isinstance(t, list):
+                    schema_types.extend(t)
+                elif t:
+                    schema_types.append(t)
+            elif isinstance(data, list):
+                for d in data:
+                    if isinstance(d, dict):
+                        t = d.get("@type") or d.get("type")
+                        if t:
+                            schema_types.append(t)
+        except Exception:
+            continue
+    return ", ".join(schema_types)
+
+
+def extract_meta_tag(page, name=None, property_name=None):
+    if name:
+        content = page["meta_name"].get(name)
+        if content:
+            return content.strip()
+    if property_name:
+        content = page["meta_property"].get(property_name)
+        if content:
+            return content.strip()
+    return ""
+
+
+def extract_canonical_url(page, page_url):
+    href = page["canonical_href"]
+    if href:
+        return normalize_url(urljoin(page_url, href))
+    return ""
+
+_BLOG_PATH_RE = re.compile(r"/blog/|/news/|/posts/|/articles/")
+_PRODUCT_PATH_RE = re.compile(r"/product/|/shop/|/item/|/store/|/collections/")
+_LANDING_PATH_RE = re.compile(r"/about|/contact|/service|/services|/pricing|/features")
+
+def detect_content_type(url, page):
+    u = url.lower()
+    if _BLOG_PATH_RE.search(u) or page["has_article"]:
+        return "Blog / Article"
+    if _PRODUCT_PATH_RE.search(u):
+        return "Product"
+    if _LANDING_PATH_RE.search(u):
+        return "Landing Page"
+    if page["meta_property"].get("og:type") == "product":
+        return "Product"
+    return "Other"
+
+def normalize_url(u):
+    if not u:
+        return u
+    u = u.split('#')[0].strip()
+    return u
+
+def _resolve_link(page_url, raw_href, base, seed_domain):
+    """(normalized absolute URL, whether it is on the crawled site) for an href."""
+    href = normalize_url(urljoin(page_url, raw_href))
+    internal = bool(href) and (
+        href.startswith(base + "/") or href == base or urlparse(href).netloc == seed_domain
+    )
+    return href, internal
+
+# Root-relative, protocol-relative and absolute http(s) hrefs resolve the
+# same from every page of a site, so these are memoized across pages: the
+# navigation and footer links every page repeats are resolved once per worker
+_ROOTED_HREF = ("/", "http://", "https://")
+_resolve_rooted_link = lru_cache(maxsize=4096)(_resolve_link)
+
+def parse_page(url, body, content_type, seed_domain, base):
+    """Extract every per-page crawl field from a fetched HTML body.
+
+    This is the CPU-heavy half of crawling a page, kept as a top-level
+    function of an importable module so crawl_site can run it in worker
+    processes; arguments and the returned dict are plain picklable values.
+    Returns {"fields": result columns, "internal_links", "external_links",
+    "image_urls", "favicon_candidates"}, with link lists deduplicated in
+    first-seen order.
+    """
+    parsed_url = urlparse(url)
+    page_root = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    # lxml directly rather than through BeautifulSoup's Python tree
+    # wrapper, fed bytes plus the declared charset
+    tree = parse_html(body, response_charset(content_type, body))
+    page = scan_page(tree)
+    title = page["title"] or ""
+    desc = extract_meta_tag(page, name="description")
+
+    h_tags = page["h_tags"]
+    h1 = h_tags["h1"][0] if h_tags["h1"] else ""
+
+    # Links are deduplicated as they are collected, in dicts used as
+    # insertion-ordered sets so the crawl order stays deterministic;
+    # total_links still counts every anchor. Navigation and footer menus
+    # repeat the same hrefs many times per page, so each distinct raw href
+    # is resolved and classified only once
+    internal_links, external_links = {}, {}
+    resolved = {}
+    total_links = 0
+    for raw_href in page["anchors"]:
+        link = resolved.get(raw_href)
+        if link is None:
+            if raw_href.startswith(_ROOTED_HREF):
+                link = _resolve_rooted_link(page_root, raw_href, base, seed_domain)
+            else:
+                link = _resolve_link(url, raw_href, base, seed_domain)
+            resolved[raw_href] = link
+            href, internal = link
+            if href:
+                (internal_links if internal else external_links)[href] = None
+        if link[0]:
+            total_links += 1
+
+    # Words are counted per text node (stripped chunks never merge when
+    # joined), so no page-wide token list is materialized
+    chunks = text_chunks(tree)
+    text = " ".join(chunks)
+    word_count = sum(map(len, map(str.split, chunks)))
+    link_to_word = round(total_links / word_count, 3) if word_count else 0
+
+    image_urls = []
+    for src in page["image_srcs"]:
+        img_src = normalize_url(urljoin(url, src))
+        if img_src:
+            image_urls.append(img_src)
+
+    return {
+        "fields": {
+            "Title": title, "Title Length": len(title),
+            "Description": desc, "Description Length": len(desc),
+            "H1": h1, "H Tags": json.dumps(h_tags, ensure_ascii=False),
+            "Word Count": word_count,
+            "Heading Count": sum(len(headings) for headings in h_tags.values()),
+            "Image Count": page["image_count"],
+            "Internal Links": len(internal_links),
+            "External Links": len(external_links), "Link-to-Word Ratio": link_to_word,
+            "Schema": extract_schema_types(page["ld_json"]),
+            "Content Type": detect_content_type(url, page),
+            "Canonical URL": extract_canonical_url(page, url),
+            "OG Title": extract_meta_tag(page, property_name="og:title"),
+            "OG Description": extract_meta_tag(page, property_name="og:description"),
+            "Content Text": text,
+        },
+        "internal_links": list(internal_links),
+        "external_links": list(external_links),
+        "image_urls": image_urls,
+        "favicon_candidates": [normalize_url(urljoin(url, href)) for href in page["icon_hrefs"]],
+    }
+
+# Serializes spawn_guard's swaps of the process-wide sys.modules["__main__"]
+_MAIN_SWAP_LOCK = threading.Lock()
+
+@contextmanager
+def spawn_guard():
+    """Keep spawn-context workers started in this block from running the app.
+
+    Spawned workers re-import the parent's __main__ from its __file__, and
+    under `streamlit run` that is the whole app script. Which module that
+    is comes from sys.modules["__main__"] in the parent whatever the pool
+    target is, so the entry itself is swapped: process pools start workers
+    lazily inside submit()/map(), and while those run __main__ points at
+    this module, so workers import only what their tasks need.
+    start_worker_pool() starts all of a pool's workers inside one such
+    block, so a long-lived pool needs the swap only once.
+
+    sys.modules is shared by every thread of the Streamlit server, so the
+    swap is made under a module-level lock (concurrent crawls and analyses
+    never interleave a swap with another's restore), and it is only undone
+    if the entry still points here: a ScriptRunner starting another
+    session's run inside the window installs that session's own __main__,
+    which is left in place rather than overwritten with the stale one
+    saved here. Scripts already running are unaffected either way, since
+    Streamlit executes each in its own module's namespace.
+    """
+    stand_in = sys.modules[__name__]
+    with _MAIN_SWAP_LOCK:
+        main_module = sys.modules["__main__"]
+        sys.modules["__main__"] = stand_in
+        try:
+            yield
+        finally:
+            if sys.modules.get("__main__") is stand_in:
+                sys.modules["__main__"] = main_module
+
+def _await_pool_start(barrier):
+    # Worker initializer: no worker takes its first task before every
+    # worker of the pool has been started (see start_worker_pool)
+    try:
+        barrier.wait(timeout=60)
+    except threading.BrokenBarrierError:
+        pass
+
+def start_worker_pool(max_workers):
+    """A spawn-context process pool with all of its workers already started.
+
+    Spawn pools start a worker inside each submit() that finds none idle,
+    and every such start needs spawn_guard's __main__ swap. Here one swap
+    covers max_workers warm-up tasks: workers hold their first task at a
+    barrier until all of them exist, so none goes idle before the last has
+    been started, and later submits never start another worker.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=ctx,
+        initializer=_await_pool_start, initargs=(ctx.Barrier(max_workers),),
+    )
+    with spawn_guard():
+        for _ in range(max_workers):
+            pool.submit(os.getpid)
+    return pool
@@ -1,4 +1,7 @@
+import io
+
 import pandas as pd
+import xlsxwriter
 
 
 def sanitize_for_display(df: pd.DataFrame, drop_columns=None, max_text_chars: int = 8000) -> pd.DataFrame:
@@ -26,3 +29,25 @@ def sanitize_for_display(df: pd.DataFrame, drop_columns=None, max_text_chars: in
         display_df[column] = display_df[column].apply(_shorten)
 
     return display_df
+
+
+def build_excel_report(sheets):
+    """Serialize {sheet name: DataFrame} to .xlsx bytes, streaming rows.
+
+    xlsxwriter's constant_memory mode flushes each row as soon as the next
+    one starts instead of holding the whole workbook in RAM, but it only
+    accepts rows written strictly in order, and pandas' to_excel writes
+    column by column (cells of earlier rows would be silently dropped). So
+    rows are written here directly, under the same header style pandas uses.
+    """
+    towrite = io.BytesIO()
+    workbook = xlsxwriter.Workbook(towrite, {"constant_memory": True, "strings_to_urls": False})
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    for sheet_name, sheet_df in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(c) for c in sheet_df.columns], header_format)
+        cells = sheet_df.astype(object).where(sheet_df.notna(), None)
+        for row_idx, row in enumerate(cells.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row_idx, 0, row)
+    workbook.close()
+    return towrite.getvalue()